@@ -1,100 +1,142 @@
 #!/usr/bin/python3
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import os
 import shutil
 import csv
 import json
 import numpy as np
+import pandas as pd
 
 minimum_time_window_threshold = 10.0
 velocity_proportional_diff_threshold = 0.2
 
+tracks_dtypes = {
+    "id": np.int32,
+    "frame": np.int32,
+    "laneId": np.int8,
+    "followingId": np.int32,
+    "x": np.float64,
+    "y": np.float64,
+    "xVelocity": np.float64,
+    "xAcceleration": np.float64,
+    "ttc": np.float64
+}
 
+tracks_meta_dtypes = {
+    "id": np.int32,
+    "initialFrame": np.int32,
+    "finalFrame": np.int32,
+    "numFrames": np.int32,
+    "minXVelocity": np.float64,
+    "maxXVelocity": np.float64,
+    "numLaneChanges": np.int32
+}
 
-def output_to_file_csv(first_frame, last_frame, followed_frames, follower_frames, independent_frames, output_file_path, velocity_variables, all_kinematic_variables, interagent_distance_variables, ttc_variables):
+track_column_names = ["frame", "x", "y", "xVelocity", "xAcceleration", "ttc"]
+
+
+
+def get_agent_column(columns, column_name, frame_count):
+    return columns[column_name][:frame_count]
+
+
+
+def get_following_ids(track_ids, following_ids):
+    has_following = following_ids > 0
+    if not np.any(has_following):
+        return {}
+    track_ids = track_ids[has_following]
+    following_ids = following_ids[has_following]
+    group_starts = np.flatnonzero(np.concatenate(([True], track_ids[1:] != track_ids[:-1])))
+    min_following_ids = np.minimum.reduceat(following_ids, group_starts)
+    max_following_ids = np.maximum.reduceat(following_ids, group_starts)
+    single_following = min_following_ids == max_following_ids
+    return dict(zip(track_ids[group_starts][single_following].tolist(), min_following_ids[single_following].tolist()))
+
+
+
+def get_track_columns(track_columns, tracks, track_row_indices, track_id):
+    columns = track_columns.get(track_id)
+    if columns is None:
+        row_indices = track_row_indices[track_id]
+        columns = {column_name: tracks[column_name].to_numpy()[row_indices] for column_name in track_column_names}
+        track_columns[track_id] = columns
+    return columns
+
+
+
+def get_columns_in_range(columns, first_frame, last_frame):
+    first_index = np.searchsorted(columns["frame"], first_frame, "left")
+    last_index = np.searchsorted(columns["frame"], last_frame, "right")
+    return {column_name: column[first_index:last_index] for column_name, column in columns.items()}
+
+
+
+def read_csv_lines(file_path):
+    with open(file_path, "r") as csv_file:
+        lines = csv_file.read().splitlines()
+    return lines[0], np.array(lines[1:], dtype=object)
+
+
+
+def write_csv_lines(output_file_path, header_line, lines):
+    with open(output_file_path, "w", newline="") as output_file:
+        output_file.write(header_line + "\r\n")
+        output_file.writelines(line + "\r\n" for line in lines)
+
+
+
+def get_distance_travelled(positions):
+    distance_travelled = np.zeros(len(positions))
+    np.cumsum(np.hypot(*np.diff(positions, axis=0).T), out=distance_travelled[1:])
+    return distance_travelled
+
+
+
+def output_to_file_csv(first_frame, last_frame, followed_columns, follower_columns, independent_columns, output_file_path, velocity_variables, all_kinematic_variables, interagent_distance_variables, ttc_variables):
     print(f"Generating output for {output_file_path}")
 
+    frame_count = min(len(followed_columns["frame"]), len(follower_columns["frame"]), len(independent_columns["frame"]))
+    agent_columns = {"c0": followed_columns, "c1": follower_columns, "i0": independent_columns}
+    agents = list(agent_columns.keys())
+
+    columns = {"time_index": np.arange(frame_count, dtype=np.int32)}
+
+    if all_kinematic_variables or interagent_distance_variables:
+        positions = np.stack([np.column_stack((get_agent_column(track_columns, "x", frame_count), get_agent_column(track_columns, "y", frame_count))) for track_columns in agent_columns.values()])
+
     if all_kinematic_variables:
+        for agent_index, (agent, track_columns) in enumerate(agent_columns.items()):
+            columns[f"{agent}.a"] = get_agent_column(track_columns, "xAcceleration", frame_count)
+            columns[f"{agent}.v"] = get_agent_column(track_columns, "xVelocity", frame_count)
+            columns[f"{agent}.p"] = get_distance_travelled(positions[agent_index])
         field_names = ["c0.a", "c0.v", "c0.p", "c1.a", "c1.v", "c1.p", "i0.a", "i0.v", "i0.p"]
     elif velocity_variables:
+        for agent, track_columns in agent_columns.items():
+            columns[f"{agent}.v"] = get_agent_column(track_columns, "xVelocity", frame_count)
         field_names = ["c0.v", "c1.v", "i0.v"]
     else:
+        for agent, track_columns in agent_columns.items():
+            columns[f"{agent}.a"] = get_agent_column(track_columns, "xAcceleration", frame_count)
         field_names = ["c0.a", "c1.a", "i0.a"]
 
     if interagent_distance_variables:
+        agent_indices, other_agent_indices = np.triu_indices(len(agents), k=1)
+        interagent_distances = np.linalg.norm(positions[other_agent_indices] - positions[agent_indices], axis=-1)
+        for agent_index, other_agent_index, distances in zip(agent_indices, other_agent_indices, interagent_distances):
+            columns[f"{agents[agent_index]}-{agents[other_agent_index]}.d"] = distances
         field_names += ["c0-c1.d", "c0-i0.d", "c1-i0.d"]
 
     if ttc_variables:
+        for agent, track_columns in agent_columns.items():
+            columns[f"{agent}.ttc"] = get_agent_column(track_columns, "ttc", frame_count)
         field_names += ["c0.ttc", "c1.ttc", "i0.ttc"]
 
-    with open(output_file_path, "w") as output_file:
-        field_names = ["time_index"] + field_names
-        csv_writer = csv.DictWriter(output_file, fieldnames=field_names)
-        csv_writer.writeheader()
-
-        followed_distance_travelled = None
-        follower_distance_travelled = None
-        independent_distance_travelled = None
-        for i, (followed_frame, follower_frame, independent_frame) in enumerate(zip(followed_frames, follower_frames, independent_frames)):
-            row = { "time_index": i }
-
-            if all_kinematic_variables:
-                row["c0.a"] = float(followed_frame["xAcceleration"])
-                row["c1.a"] = float(follower_frame["xAcceleration"])
-                row["i0.a"] = float(independent_frame["xAcceleration"])
-
-                row["c0.v"] = float(followed_frame["xVelocity"])
-                row["c1.v"] = float(follower_frame["xVelocity"])
-                row["i0.v"] = float(independent_frame["xVelocity"])
-
-                followed_position = np.array((float(followed_frame["x"]), float(followed_frame["y"])))
-                if followed_distance_travelled is None:
-                    followed_distance_travelled = 0
-                else:
-                    followed_distance_travelled += np.linalg.norm(followed_position - followed_previous_position)
-                row["c0.p"] = followed_distance_travelled
-                followed_previous_position = followed_position
-
-                follower_position = np.array((float(follower_frame["x"]), float(follower_frame["y"])))
-                if follower_distance_travelled is None:
-                    follower_distance_travelled = 0
-                else:
-                    follower_distance_travelled += np.linalg.norm(follower_position - follower_previous_position)
-                row["c1.p"] = follower_distance_travelled
-                follower_previous_position = follower_position
-
-                independent_position = np.array((float(independent_frame["x"]), float(independent_frame["y"])))
-                if independent_distance_travelled is None:
-                    independent_distance_travelled = 0
-                else:
-                    independent_distance_travelled += np.linalg.norm(independent_position - independent_previous_position)
-                row["i0.p"] = independent_distance_travelled
-                independent_previous_position = independent_position
-            elif velocity_variables:
-                row["c0.v"] = float(followed_frame["xVelocity"])
-                row["c1.v"] = float(follower_frame["xVelocity"])
-                row["i0.v"] = float(independent_frame["xVelocity"])
-            else:
-                row["c0.a"] = float(followed_frame["xAcceleration"])
-                row["c1.a"] = float(follower_frame["xAcceleration"])
-                row["i0.a"] = float(independent_frame["xAcceleration"])
-
-            if interagent_distance_variables:
-                followed_position = np.array((float(followed_frame["x"]), float(followed_frame["y"])))
-                follower_position = np.array((float(follower_frame["x"]), float(follower_frame["y"])))
-                independent_position = np.array((float(independent_frame["x"]), float(independent_frame["y"])))
-
-                row["c0-c1.d"] = np.linalg.norm(follower_position - followed_position)
-                row["c0-i0.d"] = np.linalg.norm(independent_position - followed_position)
-                row["c1-i0.d"] = np.linalg.norm(independent_position - follower_position)
-
-            if ttc_variables:
-                row["c0.ttc"] = float(followed_frame["ttc"])
-                row["c1.ttc"] = float(follower_frame["ttc"])
-                row["i0.ttc"] = float(independent_frame["ttc"])
-
-            csv_writer.writerow(row)
+    field_names = ["time_index"] + field_names
+    np.savetxt(output_file_path, np.column_stack([columns[field_name] for field_name in field_names]), fmt=["%d"] + ["%.6f"] * (len(field_names) - 1), delimiter=",", header=",".join(field_names), comments="", newline="\r\n")
 
 
 
@@ -112,191 +154,120 @@ def output_to_file_json_meta(scene_id, convoy_head_id, convoy_tail_id, independe
         json.dump(json_dict, output_file)
 
 
-arg_parser = argparse.ArgumentParser(description="Extracts two agent convoy scenes from the High-D dataset")
-arg_parser.add_argument("input_directory_path")
-arg_parser.add_argument("output_directory_path")
-
-arg_parser.add_argument("--csv", action="store_true")
-arg_parser.add_argument("--json-meta", action="store_true")
-
-arg_parser.add_argument("--trimmed-scene-output-path")
-
-arg_parser.add_argument("--velocity-variables", action="store_true")
-arg_parser.add_argument("--all-kinematic-variables", action="store_true")
-arg_parser.add_argument("--interagent-distance-variables", action="store_true")
-arg_parser.add_argument("--ttc-variables", action="store_true")
-args = arg_parser.parse_args()
-
-if not os.path.isdir(args.input_directory_path):
-    raise ValueError(f"Input directory path {args.input_directory_path} is not a valid directory")
 
-if not os.path.isdir(args.output_directory_path):
-    raise ValueError(f"Output directory path {args.output_directory_path} is not a valid directory")
+def get_counts_summary(success_count, no_following_count, following_is_not_valid_convoy_count, too_short_before_other_count, no_suitable_other_count):
+    return f"{success_count} Successes, {no_following_count} Failures due to no following agent, {following_is_not_valid_convoy_count} Failures due to following agent not being a valid convoy agent, {too_short_before_other_count} Failures due to too small of a time frame (prior to adding other agent), {no_suitable_other_count} Failures due to not being able to find suitable other agent"
 
-if args.trimmed_scene_output_path is not None and not os.path.isdir(args.trimmed_scene_output_path):
-    raise ValueError(f"Trimmed scene output directory path {args.trimmed_scene_output_path} is not a valid directory")
 
-if not args.csv and not args.json_meta:
-    raise ValueError("Please select either CSV or JSON meta output mode")
 
-scene_count = int(len(os.listdir(args.input_directory_path)) / 4)
-
-for i in range(1, scene_count + 1):
+def process_scene(i, scene_count, args):
     print(f"Processing scene {i} of {scene_count}")
 
-    recording_meta = None
-
     recording_meta_file_path = os.path.join(args.input_directory_path, f"{i}_recordingMeta.csv")
 
     with open(recording_meta_file_path, "r") as recording_meta_file:
-        recording_meta_reader = csv.DictReader(recording_meta_file)
-
-        for row in recording_meta_reader:
-            recording_meta = row
-            break
+        recording_meta = next(csv.DictReader(recording_meta_file), None)
 
     if recording_meta is None:
         print(f"Missing recording metadata for scene {i}")
-        continue
+        return (0, 0, 0, 0, 0)
 
-    tracks_meta_fieldnames = None
-    valid_tracks = {}
-    valid_convoy_tracks = {}
+    minimum_time_window_frames = minimum_time_window_threshold * float(recording_meta["frameRate"])
 
     tracks_meta_file_path = os.path.join(args.input_directory_path, f"{i}_tracksMeta.csv")
 
-    with open(tracks_meta_file_path, "r") as tracks_meta_file:
-        tracks_meta_reader = csv.DictReader(tracks_meta_file)
+    tracks_meta = pd.read_csv(tracks_meta_file_path, usecols=list(tracks_meta_dtypes.keys()), dtype=tracks_meta_dtypes)
+    valid_tracks_meta = tracks_meta[(tracks_meta["numLaneChanges"] == 0) & (tracks_meta["numFrames"] >= minimum_time_window_frames)]
+    valid_convoy_tracks_meta = valid_tracks_meta[(valid_tracks_meta["maxXVelocity"] - valid_tracks_meta["minXVelocity"]).abs() / valid_tracks_meta["maxXVelocity"].abs() >= velocity_proportional_diff_threshold]
 
-        for row in tracks_meta_reader:
-            if tracks_meta_fieldnames is None:
-                tracks_meta_fieldnames = list(row.keys())
-            if int(row["numLaneChanges"]) == 0 \
-            and float(row["numFrames"]) / float(recording_meta["frameRate"]) >= minimum_time_window_threshold:
-                valid_tracks[int(row["id"])] = row
+    valid_tracks = valid_tracks_meta["id"].tolist()
+    valid_convoy_tracks = valid_convoy_tracks_meta["id"].tolist()
+    track_initial_frames = dict(zip(valid_tracks, valid_tracks_meta["initialFrame"].tolist()))
+    track_final_frames = dict(zip(valid_tracks, valid_tracks_meta["finalFrame"].tolist()))
 
-                if abs(float(row["maxXVelocity"]) - float(row["minXVelocity"])) / abs(float(row["maxXVelocity"])) >= velocity_proportional_diff_threshold:
-                    valid_convoy_tracks[int(row["id"])] = -1
+    print(f"Scene {i}: Found {len(valid_tracks)} valid agents and {len(valid_convoy_tracks)} valid convoy agents")
 
-    print(f"Found {len(valid_tracks.keys())} valid agents and {len(valid_convoy_tracks.keys())} valid convoy agents")
-
-    if len(valid_convoy_tracks.keys()) == 0:
-        continue
-
-    tracks_fieldnames = None
-    track_frames = {}
+    if len(valid_convoy_tracks) == 0:
+        return (0, 0, 0, 0, 0)
 
     tracks_file_path = os.path.join(args.input_directory_path, f"{i}_tracks.csv")
 
-    with open(tracks_file_path, "r") as tracks_file:
-        tracks_reader = csv.DictReader(tracks_file)
+    tracks = pd.read_csv(tracks_file_path, usecols=list(tracks_dtypes.keys()), dtype=tracks_dtypes)
+    track_row_indices = tracks.groupby("id", sort=False).indices
+    track_columns = {}
+    lane_ids = tracks["laneId"].to_numpy()
+    track_initial_lanes = {track_id: lane_ids[row_indices[0]] for track_id, row_indices in track_row_indices.items()}
+    track_following_ids = get_following_ids(tracks["id"].to_numpy(), tracks["followingId"].to_numpy())
 
-        current_id = None
+    if args.trimmed_scene_output_path is not None:
+        tracks_meta_header_line, tracks_meta_lines = read_csv_lines(tracks_meta_file_path)
+        tracks_header_line, tracks_lines = read_csv_lines(tracks_file_path)
 
-        for row in tracks_reader:
-            if tracks_fieldnames is None:
-                tracks_fieldnames = list(row.keys())
-            if int(row["id"]) == current_id:
-                frames.append(row)
-            elif current_id is None:
-                frames = [row]
-                current_id = int(row["id"])
-            else:
-                track_frames[current_id] = frames
-                frames = [row]
-                current_id = int(row["id"])
+    valid_track_ids = valid_tracks_meta["id"].to_numpy()
+    valid_track_initial_frames = valid_tracks_meta["initialFrame"].to_numpy()
+    valid_track_final_frames = valid_tracks_meta["finalFrame"].to_numpy()
+    valid_track_order = np.argsort(valid_track_initial_frames, kind="stable")
+    sorted_valid_track_initial_frames = valid_track_initial_frames[valid_track_order]
 
-        if current_id is not None:
-            track_frames[current_id] = frames
-
-    used_tracks = {}
+    valid_convoy_track_ids = set(valid_convoy_tracks)
+    used_tracks = set()
 
     success_count = 0
     no_following_count = 0
     following_is_not_valid_convoy_count = 0
     too_short_before_other_count = 0
     no_suitable_other_count = 0
-    for valid_convoy_track in valid_convoy_tracks.keys():
-        following_id = None
-        metadata = valid_tracks[valid_convoy_track]
-        frames = track_frames[valid_convoy_track]
-
-        for frame in frames:
-            if following_id is None:
-                lane_id = int(frame["laneId"])
-                if int(frame["followingId"]) > 0:
-                    following_id = int(frame["followingId"])
-            else:
-                if int(frame["followingId"]) > 0 and int(frame["followingId"]) != following_id:
-                    following_id = None
-                    break
+
+    convoy_pairs = []
+    for valid_convoy_track in valid_convoy_tracks:
+        following_id = track_following_ids.get(valid_convoy_track)
 
         if following_id is None:
             no_following_count += 1
             continue
 
-        if valid_convoy_tracks.get(following_id) is None:
+        if following_id not in valid_convoy_track_ids:
             following_is_not_valid_convoy_count += 1
             continue
 
-        following_metadata = valid_tracks[following_id]
-        following_frames = track_frames[following_id]
+        latest_initial_frame = max(track_initial_frames[valid_convoy_track], track_initial_frames[following_id])
+        earliest_final_frame = min(track_final_frames[valid_convoy_track], track_final_frames[following_id])
 
-        latest_initial_frame = max(float(metadata["initialFrame"]), float(following_metadata["initialFrame"]))
-        earliest_final_frame = min(float(metadata["finalFrame"]), float(following_metadata["finalFrame"]))
-
-        if (earliest_final_frame - latest_initial_frame) / float(recording_meta["frameRate"]) < minimum_time_window_threshold:
+        if earliest_final_frame - latest_initial_frame < minimum_time_window_frames:
             too_short_before_other_count += 1
             continue
 
-        found_suitable_other = False
-        for valid_track in valid_tracks.keys():
-            if used_tracks.get(valid_track) is not None:
-                continue
+        convoy_pairs.append((valid_convoy_track, following_id, latest_initial_frame, earliest_final_frame))
 
-            other_lane_id = None
-            other_metadata = valid_tracks[valid_track]
-            other_frames = track_frames[valid_track]
+    for valid_convoy_track, following_id, latest_initial_frame, earliest_final_frame in convoy_pairs:
+        lane_id = track_initial_lanes[valid_convoy_track]
 
-            updated_latest_initial_frame = max(latest_initial_frame, float(other_metadata["initialFrame"]))
-            updated_earliest_final_frame = min(earliest_final_frame, float(other_metadata["finalFrame"]))
+        window_candidates = valid_track_order[:np.searchsorted(sorted_valid_track_initial_frames, earliest_final_frame - minimum_time_window_frames, "right")]
+        window_overlaps = np.minimum(earliest_final_frame, valid_track_final_frames[window_candidates]) - np.maximum(latest_initial_frame, valid_track_initial_frames[window_candidates])
+        window_candidates = np.sort(window_candidates[window_overlaps >= minimum_time_window_frames])
+        candidate_tracks = [valid_track for valid_track in valid_track_ids[window_candidates].tolist() if track_initial_lanes[valid_track] != lane_id]
 
-            if (updated_earliest_final_frame - updated_latest_initial_frame) / float(recording_meta["frameRate"]) < minimum_time_window_threshold:
+        found_suitable_other = False
+        for valid_track in candidate_tracks:
+            if valid_track in used_tracks:
                 continue
 
-            for frame in other_frames:
-                if other_lane_id is None:
-                    other_lane_id = int(frame["laneId"])
-                    break
+            updated_latest_initial_frame = max(latest_initial_frame, track_initial_frames[valid_track])
+            updated_earliest_final_frame = min(earliest_final_frame, track_final_frames[valid_track])
 
-            if other_lane_id == lane_id:
-                continue
-
-            updated_frames = []
-            for frame in frames:
-                frame_num = int(frame["frame"])
-                if frame_num >= updated_latest_initial_frame and frame_num <= updated_earliest_final_frame:
-                    updated_frames.append(frame)
+            updated_columns = get_columns_in_range(get_track_columns(track_columns, tracks, track_row_indices, valid_convoy_track), updated_latest_initial_frame, updated_earliest_final_frame)
 
-            updated_following_frames = []
-            for frame in following_frames:
-                frame_num = int(frame["frame"])
-                if frame_num >= updated_latest_initial_frame and frame_num <= updated_earliest_final_frame:
-                    updated_following_frames.append(frame)
+            updated_following_columns = get_columns_in_range(get_track_columns(track_columns, tracks, track_row_indices, following_id), updated_latest_initial_frame, updated_earliest_final_frame)
 
-            updated_other_frames = []
-            for frame in other_frames:
-                frame_num = int(frame["frame"])
-                if frame_num >= updated_latest_initial_frame and frame_num <= updated_earliest_final_frame:
-                    updated_other_frames.append(frame)
+            updated_other_columns = get_columns_in_range(get_track_columns(track_columns, tracks, track_row_indices, valid_track), updated_latest_initial_frame, updated_earliest_final_frame)
 
             if args.csv:
                 output_to_file_csv(
                 updated_latest_initial_frame,
                 updated_earliest_final_frame,
-                updated_frames,
-                updated_following_frames,
-                updated_other_frames,
+                updated_columns,
+                updated_following_columns,
+                updated_other_columns,
                 os.path.join(args.output_directory_path, f"scene-{i}-{following_id}_follows_{valid_convoy_track}-{valid_track}_independent.csv"),
                 args.velocity_variables,
                 args.all_kinematic_variables,
@@ -314,39 +285,65 @@ for i in range(1, scene_count + 1):
             if args.trimmed_scene_output_path is not None:
                 shutil.copy(recording_meta_file_path, os.path.join(args.trimmed_scene_output_path, f"scene-{i}-{following_id}_follows_{valid_convoy_track}-{valid_track}_independent-recordingMeta.csv"))
 
-                present_ids = []
-
-                with open(tracks_meta_file_path, "r") as tracks_meta_file:
-                    tracks_meta_reader = csv.DictReader(tracks_meta_file)
-                    with open(os.path.join(args.trimmed_scene_output_path, f"scene-{i}-{following_id}_follows_{valid_convoy_track}-{valid_track}_independent-tracksMeta.csv"), "w") as tracks_meta_output_file:
-                        tracks_meta_csv_writer = csv.DictWriter(tracks_meta_output_file, fieldnames=tracks_meta_fieldnames)
-                        tracks_meta_csv_writer.writeheader()
-                        for row in tracks_meta_reader:
-                            if float(row["initialFrame"]) < updated_earliest_final_frame \
-                            and float(row["finalFrame"]) > updated_latest_initial_frame:
-                                present_ids.append(row["id"])
-                                tracks_meta_csv_writer.writerow(row)
-
-                with open(tracks_file_path, "r") as tracks_file:
-                    tracks_reader = csv.DictReader(tracks_file)
-                    with open(os.path.join(args.trimmed_scene_output_path, f"scene-{i}-{following_id}_follows_{valid_convoy_track}-{valid_track}_independent-tracks.csv"), "w") as tracks_output_file:
-                        tracks_csv_writer = csv.DictWriter(tracks_output_file, fieldnames=tracks_fieldnames)
-                        tracks_csv_writer.writeheader()
-                        for row in tracks_reader:
-                            if row["id"] in present_ids:
-                                tracks_csv_writer.writerow(row)
-
+                present_tracks_meta_mask = ((tracks_meta["initialFrame"] < updated_earliest_final_frame) & (tracks_meta["finalFrame"] > updated_latest_initial_frame)).to_numpy()
+                write_csv_lines(os.path.join(args.trimmed_scene_output_path, f"scene-{i}-{following_id}_follows_{valid_convoy_track}-{valid_track}_independent-tracksMeta.csv"), tracks_meta_header_line, tracks_meta_lines[present_tracks_meta_mask])
 
+                present_tracks_mask = tracks["id"].isin(tracks_meta["id"][present_tracks_meta_mask]).to_numpy()
+                write_csv_lines(os.path.join(args.trimmed_scene_output_path, f"scene-{i}-{following_id}_follows_{valid_convoy_track}-{valid_track}_independent-tracks.csv"), tracks_header_line, tracks_lines[present_tracks_mask])
 
             found_suitable_other = True
             success_count += 1
 
-            used_tracks[valid_track] = -1
-            used_tracks[valid_convoy_track] = -1
-            used_tracks[following_id] = -1
+            used_tracks.update((valid_track, valid_convoy_track, following_id))
             break
 
         if not found_suitable_other:
             no_suitable_other_count += 1
 
-    print(f"{success_count} Successes, {no_following_count} Failures due to no following agent, {following_is_not_valid_convoy_count} Failures due to following agent not being a valid convoy agent, {too_short_before_other_count} Failures due to too small of a time frame (prior to adding other agent), {no_suitable_other_count} Failures due to not being able to find suitable other agent")
+    scene_counts = (success_count, no_following_count, following_is_not_valid_convoy_count, too_short_before_other_count, no_suitable_other_count)
+    print(f"Scene {i}: {get_counts_summary(*scene_counts)}")
+
+    return scene_counts
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Extracts two agent convoy scenes from the High-D dataset")
+    arg_parser.add_argument("input_directory_path")
+    arg_parser.add_argument("output_directory_path")
+
+    arg_parser.add_argument("--csv", action="store_true")
+    arg_parser.add_argument("--json-meta", action="store_true")
+
+    arg_parser.add_argument("--trimmed-scene-output-path")
+
+    arg_parser.add_argument("--velocity-variables", action="store_true")
+    arg_parser.add_argument("--all-kinematic-variables", action="store_true")
+    arg_parser.add_argument("--interagent-distance-variables", action="store_true")
+    arg_parser.add_argument("--ttc-variables", action="store_true")
+    arg_parser.add_argument("--num-workers", type=int)
+    args = arg_parser.parse_args()
+
+    if not os.path.isdir(args.input_directory_path):
+        raise ValueError(f"Input directory path {args.input_directory_path} is not a valid directory")
+
+    if not os.path.isdir(args.output_directory_path):
+        raise ValueError(f"Output directory path {args.output_directory_path} is not a valid directory")
+
+    if args.trimmed_scene_output_path is not None and not os.path.isdir(args.trimmed_scene_output_path):
+        raise ValueError(f"Trimmed scene output directory path {args.trimmed_scene_output_path} is not a valid directory")
+
+    if not args.csv and not args.json_meta:
+        raise ValueError("Please select either CSV or JSON meta output mode")
+
+    if args.num_workers is not None and args.num_workers < 1:
+        raise ValueError(f"Number of workers {args.num_workers} must be at least 1")
+
+    scene_count = int(len(os.listdir(args.input_directory_path)) / 4)
+
+    total_counts = (0, 0, 0, 0, 0)
+
+    with ProcessPoolExecutor(max_workers=args.num_workers) as executor:
+        for scene_counts in executor.map(partial(process_scene, scene_count=scene_count, args=args), range(1, scene_count + 1)):
+            total_counts = tuple(total_count + count for total_count, count in zip(total_counts, scene_counts))
+
+    print(f"Total: {get_counts_summary(*total_counts)}")